@@ -0,0 +1,149 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import struct
+import sys
+import typing
+from array import array
+from CompilationEngine import CompilationEngine
+
+# Binary parse tree format (.jpt)
+#
+# - magic: b"JPT\x02"
+# - string table: uint32 byte length, followed by every tag name and value
+#   in UTF-8, separated by "\n" (which no Jack token can contain).
+# - terminal table: uint32 count, followed by a (tag index, value index)
+#   uint32 pair for every distinct terminal.
+# - nodes: the tree in document order, as uint32 words:
+#   - terminal: its index in the terminal table.
+#   - non-terminal: tag index | NON_TERMINAL, followed by the number of
+#     words inside it.
+# All integers are little endian.
+MAGIC = b"JPT\x02"
+NON_TERMINAL = 0x80000000
+TAG_MASK = NON_TERMINAL - 1
+XML_UNESCAPE = {"&lt;": "<", "&gt;": ">", "&amp;": "&"}
+
+# A terminal is (tag, value), a non-terminal is (tag, [children])
+Node = typing.Tuple[str, typing.Union[str, list]]
+
+
+class BinaryCompilationEngine(CompilationEngine):
+    """Gets input from a JackTokenizer and emits its parsed structure into a
+    binary output stream, in the compact format described above. Terminal
+    values are written as they appear in the source, without XML escaping.
+    """
+
+    def __init__(self, input_stream: "JackTokenizer", output_stream) -> None:
+        """
+        Creates a new compilation engine with the given input and output. The
+        next routine called must be compileClass()
+        :param input_stream: The input stream.
+        :param output_stream: The binary output stream.
+        """
+        super().__init__(input_stream, output_stream)
+        self.strings = {}
+        # (tag index, value index) -> index in the terminal table
+        self.terminals = {}
+        self.nodes = array("I")
+        # index in self.nodes of every non-terminal that is still open
+        self.open_nodes = []
+
+    # get the index of a string in the string table, adding it if needed
+    def intern(self, string):
+        index = self.strings.get(string)
+        if index is None:
+            index = self.strings[string] = len(self.strings)
+        return index
+
+    def write_non_terminal_start(self, rule):
+        self.open_nodes.append(len(self.nodes))
+        self.nodes.append(self.intern(rule) | NON_TERMINAL)
+        self.nodes.append(0)
+
+    def write_non_terminal_end(self):
+        start = self.open_nodes.pop()
+        self.nodes[start + 1] = len(self.nodes) - start - 2
+
+    def write_terminal(self):
+        token = self.tokenizer.current_token()
+        self.write_terminal_value(XML_UNESCAPE.get(token, token))
+
+    def write_string_const(self):
+        self.write_terminal_value(self.tokenizer.string_val())
+
+    def write_terminal_value(self, value):
+        terminal = (self.intern(self.XML_dict[self.tokenizer.token_type()]),
+                    self.intern(value))
+        index = self.terminals.get(terminal)
+        if index is None:
+            index = self.terminals[terminal] = len(self.terminals)
+        self.nodes.append(index)
+        self.tokenizer.advance()
+
+    def compile_class(self) -> None:
+        """Compiles a complete class, then writes it to the output stream."""
+        super().compile_class()
+        table = "\n".join(self.strings).encode("utf-8")
+        terminals = array("I", [index for terminal in self.terminals
+                                for index in terminal])
+        if sys.byteorder != "little":
+            terminals.byteswap()
+            self.nodes.byteswap()
+        self.outFile.write(MAGIC + struct.pack("<I", len(table)) + table)
+        self.outFile.write(struct.pack("<I", len(self.terminals)))
+        self.outFile.write(terminals.tobytes())
+        self.outFile.write(self.nodes.tobytes())
+
+
+def load_parse_tree(data: bytes) -> Node:
+    """Reads back a parse tree written by BinaryCompilationEngine.
+
+    Args:
+        data (bytes): the contents of a .jpt file.
+
+    Returns:
+        Node: the root node. A terminal is a (tag, value) tuple, and a
+        non-terminal is a (tag, children) tuple where children is a list of
+        nodes.
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("not a binary parse tree")
+    table_end = 8 + struct.unpack_from("<I", data, 4)[0]
+    strings = data[8:table_end].decode("utf-8").split("\n")
+    nodes_start = table_end + 4 + 8 * struct.unpack_from(
+        "<I", data, table_end)[0]
+    words = array("I")
+    words.frombytes(data[table_end + 4:])
+    if sys.byteorder != "little":
+        words.byteswap()
+    terminal_count = (nodes_start - table_end - 4) // 4
+    # every distinct terminal is built once and shared by all its uses
+    terminals = [(strings[tag], strings[value]) for tag, value in zip(
+        words[0:terminal_count:2], words[1:terminal_count:2])]
+
+    root = []
+    children = root
+    # the children lists of the open non-terminals, and how many words the
+    # enclosing non-terminal has left once each one is closed
+    stack = []
+    remaining = len(words) - terminal_count
+    nodes = iter(words[terminal_count:])
+    for word in nodes:
+        if word & NON_TERMINAL:
+            size = next(nodes)
+            node_children = []
+            children.append((strings[word & TAG_MASK], node_children))
+            stack.append((children, remaining - 2 - size))
+            children = node_children
+            remaining = size
+        else:
+            children.append(terminals[word])
+            remaining -= 1
+        while not remaining and stack:
+            children, remaining = stack.pop()
+    return root[0]
@@ -6,8 +6,100 @@ as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
 import typing
+from collections import OrderedDict
 #FIXME : can't deal with multiline comments properly
 
+
+class TerminalLineCache:
+    """Renders the XML line of a terminal, keyed by (token type, value,
+    depth), and remembers it. Keyword and symbol lines are built up front
+    for the usual depths. Identifier lines are kept in a least recently used
+    cache of bounded size. Other terminals are rendered every time.
+    """
+    XML_dict = {"KEYWORD": "keyword", "SYMBOL": "symbol", "IDENTIFIER": "identifier",
+                "INT_CONST": "integerConstant", "STRING_CONST": "stringConstant"}
+    keywords = ("class", "constructor", "function", "method", "field", "static",
+                "var", "int", "char", "boolean", "void", "true", "false", "null",
+                "this", "let", "do", "if", "else", "while", "return")
+    # as they come from the tokenizer, already escaped for XML
+    symbols = ("{", "}", "(", ")", "[", "]", ".", ",", ";", "+", "-", "*", "/",
+               "&amp;", "|", "&lt;", "&gt;", "=", "~")
+
+    def __init__(self, identifier_capacity: int = 4096,
+                 prebuilt_depth: int = 16) -> None:
+        """
+        :param identifier_capacity: The most identifier lines kept at once.
+        :param prebuilt_depth: Keyword and symbol lines are built up front
+        for every depth below this one.
+        """
+        self.identifier_capacity = identifier_capacity
+        # keyword and symbol lines, never evicted
+        self.lines = {}
+        for depth in range(prebuilt_depth):
+            for token_type, values in (("KEYWORD", self.keywords),
+                                       ("SYMBOL", self.symbols)):
+                for value in values:
+                    self.lines[token_type, value, depth] = self.render(
+                        token_type, value, depth)
+        self.identifier_lines = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.identifier_hits = 0
+        self.identifier_misses = 0
+
+    # build the XML line of a terminal
+    def render(self, token_type, value, depth):
+        tag = self.XML_dict[token_type]
+        return "  " * depth + "<" + tag + "> " + value + " </" + tag + ">\n"
+
+    # get the XML line of a terminal, from the cache when possible
+    def line(self, token_type, value, depth):
+        key = (token_type, value, depth)
+        if token_type == "IDENTIFIER":
+            line = self.identifier_lines.get(key)
+            if line is not None:
+                self.identifier_hits += 1
+                self.identifier_lines.move_to_end(key)
+                return line
+            self.identifier_misses += 1
+            line = self.identifier_lines[key] = self.render(
+                token_type, value, depth)
+            if len(self.identifier_lines) > self.identifier_capacity:
+                self.identifier_lines.popitem(last=False)
+            return line
+        if token_type != "KEYWORD" and token_type != "SYMBOL":
+            return self.render(token_type, value, depth)
+        line = self.lines.get(key)
+        if line is not None:
+            self.hits += 1
+            return line
+        self.misses += 1
+        # deeper than prebuilt, there are few enough to keep them all
+        line = self.lines[key] = self.render(token_type, value, depth)
+        return line
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: the hit and miss counts of the cache and its hit rates,
+            overall and for identifiers alone. Terminals that are never
+            cached are not counted.
+        """
+        hits = self.hits + self.identifier_hits
+        lookups = hits + self.misses + self.identifier_misses
+        identifier_lookups = self.identifier_hits + self.identifier_misses
+        return {
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "identifier_hits": self.identifier_hits,
+            "identifier_misses": self.identifier_misses,
+            "identifier_hit_rate": (self.identifier_hits / identifier_lookups
+                                    if identifier_lookups else 0.0),
+            "identifier_lines": len(self.identifier_lines),
+        }
+
+
 class CompilationEngine:
     """Gets input from a JackTokenizer and emits its parsed structure into an
     output stream.
@@ -16,6 +108,9 @@ class CompilationEngine:
                 "INT_CONST": "integerConstant", "STRING_CONST": "stringConstant"}
     binary_op_set = {"+", "-", "*", "/", "&amp;", "&lt;", "&gt;", "|", "="}
     unary_op_set = {"-", "~"}
+    # shared by all the engines, so repeated identifiers are rendered once
+    # per process rather than once per file
+    line_cache = TerminalLineCache()
 
     def __init__(self, input_stream: "JackTokenizer", output_stream) -> None:
         """
@@ -29,6 +124,7 @@ class CompilationEngine:
         # output_stream.write("Hello world! \n")
         self.tokenizer = input_stream
         self.indent = ""
+        self.depth = 0
         self.outFile = output_stream
         self.current_process = []
 
@@ -36,10 +132,12 @@ class CompilationEngine:
     # add indent to the XML txt file
     def add_indent(self):
         self.indent += "  "
+        self.depth += 1
 
     # remove indent from the XML text file
     def remove_indent(self):
         self.indent = self.indent[:-2]
+        self.depth -= 1
 
     # write the start of non-terminal rule
     def write_non_terminal_start(self, rule):
@@ -54,15 +152,13 @@ class CompilationEngine:
 
     # write terminal rule
     def write_terminal(self):
-        self.outFile.write(self.indent + "<" + self.XML_dict[self.tokenizer.token_type()] + "> " +
-                           self.tokenizer.current_token() + " </" + self.XML_dict[
-                               self.tokenizer.token_type()] + ">" + "\n")
+        self.outFile.write(self.line_cache.line(
+            self.tokenizer.token_type(), self.tokenizer.current_token(), self.depth))
         self.tokenizer.advance()
 
     def write_string_const(self):
-        self.outFile.write(self.indent + "<" + self.XML_dict[self.tokenizer.token_type()] + "> " +
-                           self.tokenizer.string_val() + " </" + self.XML_dict[
-                               self.tokenizer.token_type()] + ">" + "\n")
+        self.outFile.write(self.indent + "<stringConstant> " +
+                           self.tokenizer.string_val() + " </stringConstant>\n")
         self.tokenizer.advance()
 
     ############################## GENERAL HELPER METHODS END ##############################
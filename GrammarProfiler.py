@@ -0,0 +1,99 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import functools
+import time
+import typing
+
+
+class GrammarProfiler:
+    """Measures where a CompilationEngine spends its time, per grammar rule
+    (compile_* method) and per nesting path of rules: call counts, inclusive
+    and exclusive time, and the number of tokens consumed.
+
+    Only the engines given to instrument() are measured, by wrapping their
+    compile_* methods, so engines that are not profiled run as usual.
+    """
+
+    def __init__(self) -> None:
+        # rule -> [calls, inclusive ns, exclusive ns, tokens]
+        self.rules = {}
+        # nesting path -> [calls, inclusive ns, exclusive ns, tokens]
+        self.paths = {}
+        # one [rule, start ns, children ns, first token] per running rule
+        self.stack = []
+        # how many calls of every rule are running, so the inclusive time
+        # and tokens of recursive rules are only counted once
+        self.running = {}
+        self.tokenizer = None
+
+    def instrument(self, engine: "CompilationEngine") -> None:
+        """Starts measuring the grammar rules of the given engine."""
+        for name in dir(engine):
+            if name.startswith("compile_"):
+                setattr(engine, name, self.wrap(name, getattr(engine, name)))
+        self.tokenizer = engine.tokenizer
+
+    def wrap(self, rule: str, method: typing.Callable) -> typing.Callable:
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            self.enter(rule)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.exit()
+        return profiled
+
+    # start measuring a call of a grammar rule
+    def enter(self, rule):
+        self.running[rule] = self.running.get(rule, 0) + 1
+        self.stack.append(
+            [rule, time.perf_counter_ns(), 0, self.tokenizer.token_index])
+
+    # finish measuring the innermost call
+    def exit(self):
+        end = time.perf_counter_ns()
+        path = tuple(frame[0] for frame in self.stack)
+        rule, start, children, first_token = self.stack.pop()
+        inclusive = end - start
+        tokens = self.tokenizer.token_index - first_token
+        if self.stack:
+            self.stack[-1][2] += inclusive
+        self.running[rule] -= 1
+        outermost = self.running[rule] == 0
+        for totals, key in ((self.rules, rule), (self.paths, path)):
+            entry = totals.get(key)
+            if entry is None:
+                entry = totals[key] = [0, 0, 0, 0]
+            entry[0] += 1
+            entry[2] += inclusive - children
+            if outermost or totals is self.paths:
+                entry[1] += inclusive
+                entry[3] += tokens
+
+    def write_folded(self, output_stream: typing.TextIO) -> None:
+        """Writes the exclusive time of every nesting path, in microseconds,
+        in the folded stack format read by flamegraph tools:
+        "compile_class;compile_subroutine;compile_statements 1234".
+        """
+        for path, (_, _, exclusive, _) in sorted(self.paths.items()):
+            output_stream.write(
+                "%s %d\n" % (";".join(path), round(exclusive / 1000)))
+
+    def summary(self) -> str:
+        """
+        Returns:
+            str: a table of the measurements of every grammar rule, the
+            rules with the most exclusive time first.
+        """
+        lines = ["%-26s %9s %13s %13s %9s" % (
+            "rule", "calls", "inclusive ms", "exclusive ms", "tokens")]
+        for rule, (calls, inclusive, exclusive, tokens) in sorted(
+                self.rules.items(), key=lambda item: -item[1][2]):
+            lines.append("%-26s %9d %13.3f %13.3f %9d" % (
+                rule, calls, inclusive / 1e6, exclusive / 1e6, tokens))
+        return "\n".join(lines) + "\n"
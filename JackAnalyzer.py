@@ -5,52 +5,309 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import fnmatch
+import io
 import os
+import re
 import sys
+import types
 import typing
+from BinaryCompilationEngine import BinaryCompilationEngine
 from CompilationEngine import CompilationEngine
+from JackNormalizer import NormalizerCache
 from JackTokenizer import JackTokenizer
 
+# For every output format: the output file extension, the mode to open it
+# with, and the compilation engine that writes it
+OUTPUT_FORMATS = {
+    "xml": (".xml", 'w', CompilationEngine),
+    "binary": (".jpt", 'wb', BinaryCompilationEngine),
+}
+
 
 def analyze_file(
-        input_file: typing.TextIO, output_file: typing.TextIO) -> None:
+        input_file: typing.TextIO, output_file: typing.IO,
+        engine_class: typing.Type[CompilationEngine] = CompilationEngine,
+        tokens_file: typing.Optional[typing.TextIO] = None,
+        normalized: bool = False,
+        profiler: typing.Optional["GrammarProfiler"] = None) -> None:
     """Analyzes a single file.
 
     Args:
         input_file (typing.TextIO): the file to analyze.
-        output_file (typing.TextIO): writes all output to this file.
+        output_file (typing.IO): writes all output to this file.
+        engine_class (typing.Type[CompilationEngine]): the compilation engine
+            to write the output with, see OUTPUT_FORMATS.
+        tokens_file (typing.Optional[typing.TextIO]): if given, the token
+            listing is written to this file as well. Both outputs are made
+            from the same tokenizer, so the input is only read and
+            tokenized once.
+        normalized (bool): True if the input was already normalized by
+            JackNormalizer.
+        profiler (typing.Optional[GrammarProfiler]): if given, measures the
+            grammar rules of the compilation engine.
     """
     # Your code goes here!
     # It might be good to start by creating a new JackTokenizer and CompilationEngine:
     # tokenizer = JackTokenizer(input_file)
     # engine = CompilationEngine(tokenizer, output_file)
-    tokenizer = JackTokenizer(input_file)
-    engine = CompilationEngine(tokenizer, output_file)
-    print(tokenizer.token_list)
+    tokenizer = JackTokenizer(input_file, normalized)
+    if tokens_file is not None:
+        write_tokens(tokenizer, tokens_file)
+        tokenizer.reset()
+    engine = engine_class(tokenizer, output_file)
+    if profiler is not None:
+        profiler.instrument(engine)
     engine.compile_class()
 
 
+def write_tokens(tokenizer: JackTokenizer, output_file: typing.TextIO) \
+        -> None:
+    """Writes the tokens of a tokenizer as a flat <tokens> XML listing.
 
-if "__main__" == __name__:
+    Args:
+        tokenizer (JackTokenizer): the tokenizer, its remaining tokens are
+            written.
+        output_file (typing.TextIO): writes all output to this file.
+    """
+    lines = ["<tokens>\n"]
+    xml_dict = CompilationEngine.XML_dict
+    while tokenizer.has_more_tokens():
+        token_type = tokenizer.token_type()
+        if token_type == "STRING_CONST":
+            value = tokenizer.string_val()
+        else:
+            value = tokenizer.current_token()
+        tag = xml_dict[token_type]
+        lines.append("<" + tag + "> " + value + " </" + tag + ">\n")
+        tokenizer.advance()
+    lines.append("</tokens>\n")
+    output_file.write("".join(lines))
+
+
+def compile_globs(patterns: typing.Sequence[str]) -> typing.Optional[
+        typing.Pattern]:
+    """Compiles glob patterns into a single regular expression.
+
+    Args:
+        patterns (typing.Sequence[str]): shell-style globs, e.g. "*/test/*".
+
+    Returns:
+        typing.Optional[typing.Pattern]: a pattern matching any of the
+        globs, or None if there are no globs.
+    """
+    if not patterns:
+        return None
+    return re.compile("|".join(
+        fnmatch.translate(pattern) for pattern in patterns))
+
+
+def is_selected(path: str, include: typing.Optional[typing.Pattern],
+                exclude: typing.Optional[typing.Pattern]) -> bool:
+    """Checks whether a path is a Jack file that passes the glob filters.
+
+    Args:
+        path (str): the path, relative to the searched root when walking.
+        include (typing.Optional[typing.Pattern]): if given, the path or its
+            basename must match it.
+        exclude (typing.Optional[typing.Pattern]): if given, the path and
+            its basename must not match it.
+    """
+    if path[-5:].lower() != ".jack":
+        return False
+    name = os.path.basename(path)
+    if include is not None and not (include.match(path) or
+                                    include.match(name)):
+        return False
+    if exclude is not None and (exclude.match(path) or exclude.match(name)):
+        return False
+    return True
+
+
+def iter_jack_files(
+        root: str, include: typing.Optional[typing.Pattern] = None,
+        exclude: typing.Optional[typing.Pattern] = None) \
+        -> typing.Iterator[str]:
+    """Walks a directory tree and yields its Jack files as they are found.
+
+    Uses os.scandir so that the type of each entry comes from the directory
+    listing itself, and yields every file right away instead of collecting
+    the whole tree first. Directories matching exclude are not descended
+    into, and symbolic links to directories are not followed.
+
+    Args:
+        root (str): the directory to walk.
+        include (typing.Optional[typing.Pattern]): see is_selected.
+        exclude (typing.Optional[typing.Pattern]): see is_selected.
+    """
+    # Each entry is a directory and its path relative to root
+    pending = [(root, "")]
+    while pending:
+        directory, relative = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        subdirectories = []
+        with entries:
+            for entry in entries:
+                relative_path = relative + entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if exclude is None or not (
+                            exclude.match(relative_path) or
+                            exclude.match(entry.name)):
+                        subdirectories.append(
+                            (entry.path, relative_path + "/"))
+                elif is_selected(relative_path, include, exclude):
+                    yield entry.path
+        # Reversed so that directories are visited in listing order
+        pending.extend(reversed(subdirectories))
+
+
+def iter_listed_files(
+        list_file: typing.TextIO,
+        include: typing.Optional[typing.Pattern] = None,
+        exclude: typing.Optional[typing.Pattern] = None) \
+        -> typing.Iterator[str]:
+    """Yields the Jack files named in a file list, one path per line.
+
+    Args:
+        list_file (typing.TextIO): the file list. Blank lines are ignored.
+        include (typing.Optional[typing.Pattern]): see is_selected.
+        exclude (typing.Optional[typing.Pattern]): see is_selected.
+    """
+    for line in list_file:
+        path = line.strip()
+        if path and is_selected(path, include, exclude):
+            yield os.path.abspath(path)
+
+
+def parse_arguments(argv: typing.List[str]) -> "argparse.Namespace":
+    """Parses the command line arguments of the analyzer."""
+    if len(argv) == 1 and not argv[0].startswith("-"):
+        # The usual 'JackAnalyzer <input path>' is parsed by hand, since
+        # importing argparse takes longer than analyzing a small file
+        return types.SimpleNamespace(
+            input_path=argv[0], include=[], exclude=[], files_from=None,
+            format="xml", metrics=False, tokens=False, cache_dir=None,
+            profile=None)
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="JackAnalyzer",
+        description="Analyzes Jack files into parse tree XML files.")
+    parser.add_argument(
+        "input_path", nargs="?",
+        help="a .jack file, or a directory that is searched recursively")
+    parser.add_argument(
+        "--include", action="append", default=[], metavar="GLOB",
+        help="only analyze files whose path or name matches GLOB")
+    parser.add_argument(
+        "--exclude", action="append", default=[], metavar="GLOB",
+        help="skip files and directories whose path or name matches GLOB")
+    parser.add_argument(
+        "--files-from", metavar="FILE",
+        help="read the files to analyze from FILE, one per line "
+             "('-' for standard input)")
+    parser.add_argument(
+        "--format", choices=sorted(OUTPUT_FORMATS), default="xml",
+        help="the output format: parse tree XML (default) or the compact "
+             "binary parse tree")
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="write source metrics of all the input files as JSON to "
+             "standard output, instead of writing any output files")
+    parser.add_argument(
+        "--tokens", action="store_true",
+        help="also write the token listing of every input file to "
+             "<name>T.xml")
+    parser.add_argument(
+        "--cache-dir", metavar="DIR",
+        help="cache the comment-free form of every input file in DIR, "
+             "keyed by content, and reuse it on later runs")
+    parser.add_argument(
+        "--profile", metavar="FILE",
+        help="measure every grammar rule, write the time spent in each "
+             "nesting path of rules to FILE in folded stack format, and a "
+             "summary per rule to standard error")
+    arguments = parser.parse_args(argv)
+    if arguments.input_path is None and arguments.files_from is None:
+        parser.error("Invalid usage, please use: JackAnalyzer <input path>")
+    return arguments
+
+
+def iter_input_files(arguments: "argparse.Namespace") -> typing.Iterator[str]:
+    """Yields every input file selected by the command line arguments."""
+    include = compile_globs(arguments.include)
+    exclude = compile_globs(arguments.exclude)
+    if arguments.input_path is not None:
+        argument_path = os.path.abspath(arguments.input_path)
+        if os.path.isdir(argument_path):
+            yield from iter_jack_files(argument_path, include, exclude)
+        elif is_selected(argument_path, include, exclude):
+            yield argument_path
+    if arguments.files_from == "-":
+        yield from iter_listed_files(sys.stdin, include, exclude)
+    elif arguments.files_from is not None:
+        with open(arguments.files_from, 'r') as list_file:
+            yield from iter_listed_files(list_file, include, exclude)
+
+
+def main(argv: typing.List[str]) -> None:
+    """Runs the analyzer with the given command line arguments."""
     # Parses the input path and calls analyze_file on each input file.
+    # Files are analyzed as soon as they are found, so big trees start
+    # producing output before the walk is over.
     # This opens both the input and the output files!
     # Both are closed automatically when the code finishes running.
     # If the output file does not exist, it is created automatically in the
     # correct path, using the correct filename.
-    if not len(sys.argv) == 2:
-        sys.exit("Invalid usage, please use: JackAnalyzer <input path>")
-    argument_path = os.path.abspath(sys.argv[1])
-    if os.path.isdir(argument_path):
-        files_to_assemble = [
-            os.path.join(argument_path, filename)
-            for filename in os.listdir(argument_path)]
-    else:
-        files_to_assemble = [argument_path]
-    for input_path in files_to_assemble:
-        filename, extension = os.path.splitext(input_path)
-        if extension.lower() != ".jack":
-            continue
-        output_path = filename + ".xml"
+    arguments = parse_arguments(argv)
+    if arguments.metrics:
+        # Only imported when needed, to keep the startup of plain runs fast
+        import json
+        from MetricsCompilationEngine import collect_metrics
+        if arguments.input_path is None:
+            root = os.getcwd()
+        elif os.path.isdir(arguments.input_path):
+            root = os.path.abspath(arguments.input_path)
+        else:
+            root = os.path.dirname(os.path.abspath(arguments.input_path))
+        json.dump(collect_metrics(iter_input_files(arguments), root),
+                  sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    extension, mode, engine_class = OUTPUT_FORMATS[arguments.format]
+    cache = None
+    if arguments.cache_dir is not None:
+        cache = NormalizerCache(arguments.cache_dir)
+    profiler = None
+    if arguments.profile is not None:
+        # Only imported when needed, to keep the startup of plain runs fast
+        from GrammarProfiler import GrammarProfiler
+        profiler = GrammarProfiler()
+    for input_path in iter_input_files(arguments):
+        output_path = input_path[:-len(".jack")] + extension
         with open(input_path, 'r') as input_file, \
-                open(output_path, 'w') as output_file:
-            analyze_file(input_file, output_file)
+                open(output_path, mode) as output_file:
+            if cache is not None:
+                input_file = io.StringIO(cache.normalize(input_file.read()))
+            if not arguments.tokens:
+                analyze_file(input_file, output_file, engine_class,
+                             normalized=cache is not None, profiler=profiler)
+                continue
+            tokens_path = input_path[:-len(".jack")] + "T.xml"
+            with open(tokens_path, 'w') as tokens_file:
+                analyze_file(input_file, output_file, engine_class,
+                             tokens_file, cache is not None, profiler)
+    if profiler is not None:
+        with open(arguments.profile, 'w') as profile_file:
+            profiler.write_folded(profile_file)
+        sys.stderr.write(profiler.summary())
+
+
+if "__main__" == __name__:
+    main(sys.argv[1:])
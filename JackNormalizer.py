@@ -0,0 +1,154 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import re
+import sys
+import typing
+
+# Bump whenever the output of normalize_lines changes, so that old cache
+# entries are not used anymore
+VERSION = b"1"
+
+# a string literal, the start of a line comment, or the start of a block
+# comment, whichever comes first
+SPECIAL_PATTERN = re.compile(r'("[^"\n]*"?)|(//)|(/\*)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_lines(lines: typing.Iterable[str]) -> typing.Iterator[str]:
+    """Turns Jack source into its canonical form, one line at a time.
+
+    Comments are removed, a block comment counting as a single space. Runs
+    of whitespace are collapsed into a single space, lines are stripped and
+    empty lines are dropped. String literals are left untouched.
+
+    Args:
+        lines (typing.Iterable[str]): the source lines, e.g. an open file.
+
+    Returns:
+        typing.Iterator[str]: the normalized lines, without line endings.
+    """
+    inside_block_comment = False
+    for line in lines:
+        pieces = []
+        code = ""
+        position = 0
+        while position < len(line):
+            if inside_block_comment:
+                end = line.find("*/", position)
+                if end == -1:
+                    break
+                inside_block_comment = False
+                code += " "
+                position = end + 2
+                continue
+            match = SPECIAL_PATTERN.search(line, position)
+            if match is None:
+                code += line[position:]
+                break
+            code += line[position:match.start()]
+            string, line_comment, _ = match.groups()
+            if line_comment:
+                break
+            position = match.end()
+            if string:
+                pieces.append(WHITESPACE_PATTERN.sub(" ", code))
+                pieces.append(string)
+                code = ""
+            else:
+                inside_block_comment = True
+        pieces.append(WHITESPACE_PATTERN.sub(" ", code))
+        normalized = "".join(pieces).strip()
+        if normalized:
+            yield normalized
+
+
+def normalize(source: str) -> str:
+    """
+    Returns:
+        str: the canonical form of the given Jack source, see
+        normalize_lines, with every line ending in a newline.
+    """
+    return "".join(line + "\n" for line in normalize_lines(
+        source.splitlines()))
+
+
+def default_cache_directory() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "jack-normalizer")
+
+
+class NormalizerCache:
+    """Keeps the normalized form of Jack sources in a directory, keyed by
+    the hash of their content, so each source is only normalized once.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Args:
+            directory (str): the cache directory, created if needed.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def normalize(self, source: str) -> str:
+        """
+        Returns:
+            str: the same as normalize(source), read from the cache if it
+            was already computed.
+        """
+        # imported here since it is slow to import, and the tokenizer
+        # imports this module on every run
+        import hashlib
+        digest = hashlib.sha256(VERSION + b"\0" + source.encode("utf-8"))
+        path = os.path.join(self.directory, digest.hexdigest() + ".jack")
+        try:
+            with open(path, 'r') as cached_file:
+                return cached_file.read()
+        except FileNotFoundError:
+            pass
+        normalized = normalize(source)
+        # written to a temporary file first, so that concurrent runs never
+        # see a partially written entry
+        temporary_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(temporary_path, 'w') as temporary_file:
+            temporary_file.write(normalized)
+        os.replace(temporary_path, path)
+        return normalized
+
+
+if "__main__" == __name__:
+    # Writes the normalized form of every input file to standard output.
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="JackNormalizer",
+        description="Writes Jack sources without comments and with "
+                    "collapsed whitespace to standard output.")
+    parser.add_argument(
+        "input_paths", nargs="*", default=["-"], metavar="input_path",
+        help="a .jack file, or '-' for standard input (the default)")
+    parser.add_argument(
+        "--cache-dir", default=default_cache_directory(), metavar="DIR",
+        help="where normalized files are cached (default: %(default)s)")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="normalize every file, without reading or writing the cache")
+    arguments = parser.parse_args()
+    cache = None if arguments.no_cache else NormalizerCache(
+        arguments.cache_dir)
+    for input_path in arguments.input_paths:
+        if input_path == "-":
+            # streamed line by line, since it can only be read once
+            for normalized_line in normalize_lines(sys.stdin):
+                sys.stdout.write(normalized_line + "\n")
+            continue
+        with open(input_path, 'r') as input_file:
+            source = input_file.read()
+        sys.stdout.write(normalize(source) if cache is None
+                         else cache.normalize(source))
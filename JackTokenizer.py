@@ -7,6 +7,7 @@ Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
 import typing
 import re
+from JackNormalizer import normalize_lines
 
 
 class JackTokenizer:
@@ -92,95 +93,61 @@ class JackTokenizer:
 
     Note that ^, # correspond to shiftleft and shiftright, respectively.
     """
-
-    def __init__(self, input_stream: typing.TextIO) -> None:
+    # The lexer tables are shared by all the tokenizers and built once, when
+    # the class is created.
+    # Saved keywords regular expression
+    # Changed: added \b for bound
+    keywords_regex = r'\b(?:class|constructor|function|method|field|static|var|int|char|boolean|void|true|false|null|this|let|do|if|else|while|return)\b'
+    # saved symbols regular expression
+    symbols_regex = r'\s*\{|\}\s*|\s*\(\s*|\s*\)\s*|\s*\[\s*|\s*\]\s*|\s*\.\s*|\s*,\s*|\s*;\s*|\s*\+\s*|\s*-\s*|\s*\*\s*|\s*/\s*|\s*&\s*|\s*<\s*|\s*>\s*|\s*=\s*|\s*~\s*|\s*\|\s*'
+
+    # Identifier regular expression
+    # CHANGED: z in first [] to uppercase
+    identifier_regex = r'[a-zA-Z_][a-zA-Z0-9_]*'
+    # Interger regular expression
+    integer_regex = r'\d+'
+    # String constants regular expression
+    # ORIGINAK self.string_regex = r'"[^\n]*"'
+    string_regex = r'"[^\n]*"'
+
+    # using all the patterns
+    combined_pattern = re.compile(
+        keywords_regex + '|' + symbols_regex + '|' + identifier_regex + '|' + string_regex + '|' + integer_regex)
+    # the patterns token_type() tries, in order
+    type_patterns = (
+        (re.compile(keywords_regex), "KEYWORD"),
+        (re.compile(symbols_regex), "SYMBOL"),
+        (re.compile(identifier_regex), "IDENTIFIER"),
+        (re.compile(integer_regex), "INT_CONST"),
+        (re.compile(string_regex), "STRING_CONST"),
+    )
+    replacement_dict = {"<": "&lt;", ">": "&gt;", "&": "&amp;"}
+
+    def __init__(self, input_stream: typing.TextIO,
+                 normalized: bool = False) -> None:
         """Opens the input stream and gets ready to tokenize it.
 
         Args:
             input_stream (typing.TextIO): input stream.
+            normalized (bool): True if the input was already normalized by
+                JackNormalizer, so comments need not be removed again.
         """
         # Your code goes here!
         # A good place to start is to read all the lines of the input:
         # input_lines = input_stream.read().splitlines()
-        self.clean_lines(input_stream)
-        # Saved keywords regular expression
-        # Changed: added \b for bound
-        self.keywords_regex = r'\b(?:class|constructor|function|method|field|static|var|int|char|boolean|void|true|false|null|this|let|do|if|else|while|return)\b'
-        # saved symbols regular expression
-        self.symbols_regex = r'\s*\{|\}\s*|\s*\(\s*|\s*\)\s*|\s*\[\s*|\s*\]\s*|\s*\.\s*|\s*,\s*|\s*;\s*|\s*\+\s*|\s*-\s*|\s*\*\s*|\s*/\s*|\s*&\s*|\s*<\s*|\s*>\s*|\s*=\s*|\s*~\s*|\s*\|\s*'
-
-        # Identifier regular expression
-        # CHANGED: z in first [] to uppercase
-        self.identifier_regex = r'[a-zA-Z_][a-zA-Z0-9_]*'
-        # Interger regular expression
-        self.integer_regex = r'\d+'
-        # String constants regular expression
-        # ORIGINAK self.string_regex = r'"[^\n]*"'
-        self.string_regex = r'"[^\n]*"'
+        if normalized:
+            self.input_lines = input_stream.read().splitlines()
+        else:
+            self.clean_lines(input_stream)
         # Token index
         self.token_index = 0
         # tokenize the first line
         self.tokenize_lines()
 
-    # CHANGED: DEAL WITH MULTILINE DIFFERENT
     def clean_lines(self, input_stream) -> None:
         """clean the input file from comments and space
         """
-        self.input_lines = input_stream.read().splitlines()
-        # Remove white space
-
-        # remove comments inline comment
-        self.input_lines = [self.relevantline(line)
-                            for line in self.input_lines]
-        # remove leading space
-        self.input_lines = [line.lstrip().rstrip()
-                            for line in self.input_lines]
-
-        # removing empty lines
-        self.input_lines = [
-            line for line in self.input_lines if (line != "" and line is not None and line != " ")]
-        # remove multiline comments
-        self.remove_multiline_comments()
-        # removing empty lines
-        self.input_lines = [
-            line for line in self.input_lines if (line != "" and line is not None and line != " ")]
-
-    def remove_comments(self):
-        inside_multiline_comment = False
-        inside_string = False
-        cleaned_lines = []
-        for line in self.input_lines:
-            if '"' in line:
-                inside_string = True
-                for i in range(len(line)):
-
-            if not inside_multiline_comment and not inside_string:
-                # case where the start and end is in the same line
-                if ("/*" in line or "/**") and "*/" in line:
-                    # if there is a multi line comment and code inside one line
-                    for i in range(len(line) - 1):
-                        if line[i] == "/" and line[i + 1] == "*":
-                            start = i
-                            continue
-                        if line[i] == "*" and line[i + 1] == "/":
-                            end = i
-                    line = line[:start] + line[end + 2:]
-                    cleaned_lines.append(line)
-
-                    continue
-                # Check for the start of multiline comment
-                if "/*" in line or "/**" in line:
-                    inside_multiline_comment = True
-                    # Handle the case where the start of the multiline comment is on the same line as code
-                    line = line[:line.find("/*")]
-            if not inside_multiline_comment:
-                cleaned_lines.append(line)
-            # Check for the end of multiline comment
-            if inside_multiline_comment and "*/" in line:
-                inside_multiline_comment = False
-                # Handle the case where the end of the multiline comment is on the same line as code
-                cleaned_lines.append(line[line.find("*/") + 2:])
-        self.input_lines = cleaned_lines
+        self.input_lines = list(normalize_lines(input_stream))
 
     def tokenize_lines(self) -> None:
         """Take a line from the input file and breaks it down to tokens
@@ -188,18 +155,17 @@ class JackTokenizer:
         Args:
             line (str): the line to separate 
         """
-        # using all the patterns
-        combined_pattern = re.compile(
-            self.keywords_regex + '|' + self.symbols_regex + '|' + self.identifier_regex + '|' + self.string_regex + '|' + self.integer_regex)
+        combined_pattern = self.combined_pattern
         self.token_list = [combined_pattern.findall(
             line) for line in self.input_lines]
         # making the list of list into one list
         # Also note that four of the symbols used in the Jack language (<, >, and &) are also used for XML markup, and thus they cannot appear verbatim as XML data. To solve the problem, we require the tokenizer to output these tokens as &lt;, &gt;, and &amp;
-        values_to_replace = ["<", ">", "&"]
-        replacement_dict = {"<": "&lt;", ">": "&gt;", "&": "&amp;"}
+        replacement_dict = self.replacement_dict
         self.token_list = [
-            replacement_dict[token.strip()] if token.strip() in values_to_replace else token.strip() for tokens in
-            self.token_list for token in tokens]
+            replacement_dict.get(token, token) for tokens in
+            self.token_list for token in map(str.strip, tokens)]
+        # the type of every token, filled in by token_type() on first use
+        self.token_types = [None] * len(self.token_list)
 
     def has_more_tokens(self) -> bool:
         """Do we have more tokens in the input?
@@ -225,18 +191,20 @@ class JackTokenizer:
             str: the type of the current token, can be
             "KEYWORD", "SYMBOL", "IDENTIFIER", "INT_CONST", "STRING_CONST"
         """
-        token = self.current_token()
-
-        if re.match(self.keywords_regex, token):
-            return "KEYWORD"
-        if re.match(self.symbols_regex, token):
-            return "SYMBOL"
-        if re.match(self.identifier_regex, token):
-            return "IDENTIFIER"
-        if re.match(self.integer_regex, token):
-            return "INT_CONST"
-        if re.match(self.string_regex, token):
-            return "STRING_CONST"
+        token_type = self.token_types[self.token_index]
+        if token_type is None:
+            token_type = self.classify(self.current_token())
+            self.token_types[self.token_index] = token_type
+        return token_type
+
+    def classify(self, token) -> str:
+        """
+        Returns:
+            str: the type of the given token, see token_type().
+        """
+        for pattern, token_type in self.type_patterns:
+            if pattern.match(token):
+                return token_type
 
     def keyword(self) -> str:
         """
@@ -303,47 +271,9 @@ class JackTokenizer:
 
     ################### EXTRA METHODS NOT PART OF THE ORIGINAL API###########
 
-    def relevantline(self, line) -> str:
-        """return only the relevant part of the line the includes the op
-
-        Args:
-            line (str): the line to tream
-
-        Returns:
-            str: the line after the comment is removed
-        """
-        # search for block comment
-        # end = line.find("/*")
-        # if end!=-1:
-        #     return line[:end]
-
-        # searching for line cooments
-        end = line.find("//")
-
-        # checking if the comment is inside a string
-        start_string = len(line) - 1
-        end_string = len(line) - 1
-        inside_string = False
-        for i in range(len(line)):
-            if line[i] == '"' and not inside_string:
-                start_string = i
-                inside_string = True
-                continue
-            if line[i] == '"' and inside_string:
-                end_string = i
-                break
-
-        # if end < start_string we have something like // "this is comment" need to take regular
-        if end != -1 and end < start_string:
-            return line[:end]
-        # if start_string < end < end_string the comment is inside the string, need to return regulary
-        if end != -1 and start_string < end and end <end_string:
-            return  line
-
-        if end != -1 and end > end_string and end >= start_string:
-            return line[:end]
-
-        return line
+    # go back to the first token, so the tokens can be read again
+    def reset(self) -> None:
+        self.token_index = 0
 
     def current_token(self) -> str:
         return self.token_list[self.token_index]
@@ -0,0 +1,147 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import typing
+from CompilationEngine import CompilationEngine
+from JackTokenizer import JackTokenizer
+
+
+class MetricsCompilationEngine(CompilationEngine):
+    """Gets input from a JackTokenizer and measures its parsed structure
+    instead of emitting it: token counts by type, statement counts by kind,
+    the maximum expression nesting depth, and the size of every subroutine.
+    """
+
+    def __init__(self, input_stream: "JackTokenizer") -> None:
+        """
+        Creates a new compilation engine with the given input. The next
+        routine called must be compileClass()
+        :param input_stream: The input stream.
+        """
+        super().__init__(input_stream, None)
+        self.token_counts = dict.fromkeys(self.XML_dict.values(), 0)
+        self.statement_counts = {}
+        self.tokens = 0
+        self.statements = 0
+        self.expression_depth = 0
+        self.max_expression_depth = 0
+        self.subroutines = []
+        # name, first token and first statement of the current subroutine
+        self.subroutine = None
+
+    def write_non_terminal_start(self, rule):
+        self.current_process.append(rule)
+        if rule == "expression":
+            self.expression_depth += 1
+            if self.expression_depth > self.max_expression_depth:
+                self.max_expression_depth = self.expression_depth
+        elif rule.endswith("Statement"):
+            self.statements += 1
+            self.statement_counts[rule] = \
+                self.statement_counts.get(rule, 0) + 1
+        elif rule == "subroutineDec":
+            self.subroutine = [None, self.tokens, self.statements]
+
+    def write_non_terminal_end(self):
+        rule = self.current_process.pop()
+        if rule == "expression":
+            self.expression_depth -= 1
+        elif rule == "subroutineDec":
+            name, first_token, first_statement = self.subroutine
+            self.subroutines.append({
+                "name": name,
+                "tokens": self.tokens - first_token,
+                "statements": self.statements - first_statement,
+            })
+
+    def write_terminal(self):
+        self.token_counts[self.XML_dict[self.tokenizer.token_type()]] += 1
+        # the subroutine name is the third token of its declaration
+        if self.current_process[-1] == "subroutineDec" and \
+                self.tokens - self.subroutine[1] == 2:
+            self.subroutine[0] = self.tokenizer.identifier()
+        self.tokens += 1
+        self.tokenizer.advance()
+
+    def write_string_const(self):
+        self.write_terminal()
+
+    def metrics(self) -> dict:
+        """
+        Returns:
+            dict: the metrics of the compiled class, as JSON serializable
+            values.
+        """
+        return {
+            "tokens": self.token_counts,
+            "statements": self.statement_counts,
+            "max_expression_depth": self.max_expression_depth,
+            "subroutines": self.subroutines,
+        }
+
+
+def new_directory_metrics() -> dict:
+    return {
+        "files": 0,
+        "tokens": {},
+        "statements": {},
+        "max_expression_depth": 0,
+        "subroutines": 0,
+        "subroutine_tokens": 0,
+        "max_subroutine_tokens": 0,
+    }
+
+
+def add_file_metrics(directory: dict, metrics: dict) -> None:
+    """Adds the metrics of a single file to the totals of a directory."""
+    directory["files"] += 1
+    for totals, counts in ((directory["tokens"], metrics["tokens"]),
+                           (directory["statements"], metrics["statements"])):
+        for key, count in counts.items():
+            totals[key] = totals.get(key, 0) + count
+    directory["max_expression_depth"] = max(
+        directory["max_expression_depth"], metrics["max_expression_depth"])
+    for subroutine in metrics["subroutines"]:
+        directory["subroutines"] += 1
+        directory["subroutine_tokens"] += subroutine["tokens"]
+        directory["max_subroutine_tokens"] = max(
+            directory["max_subroutine_tokens"], subroutine["tokens"])
+
+
+def collect_metrics(paths: typing.Iterable[str], root: str) -> dict:
+    """Measures Jack files one at a time and aggregates them over a tree.
+
+    Args:
+        paths (typing.Iterable[str]): the Jack files to measure.
+        root (str): the root of the tree, all paths are reported relative
+            to it.
+
+    Returns:
+        dict: {"files": {path: metrics}, "directories": {path: totals}},
+        where the totals of every directory include all of its
+        subdirectories, and "." is the whole tree.
+    """
+    files = {}
+    directories = {}
+    for path in paths:
+        with open(path, 'r') as input_file:
+            engine = MetricsCompilationEngine(JackTokenizer(input_file))
+        engine.compile_class()
+        metrics = engine.metrics()
+        relative_path = os.path.relpath(path, root)
+        files[relative_path] = metrics
+        directory = os.path.dirname(relative_path)
+        while True:
+            key = directory or "."
+            if key not in directories:
+                directories[key] = new_directory_metrics()
+            add_file_metrics(directories[key], metrics)
+            if not directory or directory == os.pardir:
+                break
+            directory = os.path.dirname(directory)
+    return {"files": files, "directories": directories}
@@ -0,0 +1,62 @@
+"""
+Compares the XML and binary parse tree outputs of the analyzer: output size,
+and the time it takes to load each one back (xml.etree.ElementTree against
+load_parse_tree).
+
+Usage: python benchmarks/parse_tree_formats.py <input path> [repeat]
+"""
+import io
+import os
+import sys
+import timeit
+import xml.etree.ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from BinaryCompilationEngine import BinaryCompilationEngine, load_parse_tree
+from CompilationEngine import CompilationEngine
+from JackAnalyzer import iter_jack_files
+from JackTokenizer import JackTokenizer
+
+
+def render(source, engine_class, output_file):
+    engine = engine_class(JackTokenizer(io.StringIO(source)), output_file)
+    engine.compile_class()
+    return output_file.getvalue()
+
+
+def main(input_path, repeat):
+    if os.path.isdir(input_path):
+        paths = list(iter_jack_files(input_path))
+    else:
+        paths = [input_path]
+    xml_outputs, binary_outputs = [], []
+    for path in paths:
+        with open(path, 'r') as input_file:
+            source = input_file.read()
+        xml_outputs.append(
+            render(source, CompilationEngine, io.StringIO()).encode("utf-8"))
+        binary_outputs.append(
+            render(source, BinaryCompilationEngine, io.BytesIO()))
+
+    xml_time = min(timeit.repeat(
+        lambda: [xml.etree.ElementTree.fromstring(data)
+                 for data in xml_outputs], number=1, repeat=repeat))
+    binary_time = min(timeit.repeat(
+        lambda: [load_parse_tree(data) for data in binary_outputs],
+        number=1, repeat=repeat))
+    xml_size = sum(map(len, xml_outputs))
+    binary_size = sum(map(len, binary_outputs))
+
+    print("files:  %d" % len(paths))
+    print("%-8s %12s %12s" % ("format", "bytes", "load (ms)"))
+    print("%-8s %12d %12.3f" % ("xml", xml_size, xml_time * 1000))
+    print("%-8s %12d %12.3f" % ("binary", binary_size, binary_time * 1000))
+    print("binary is %.1fx smaller and loads %.1fx faster" % (
+        xml_size / binary_size, xml_time / binary_time))
+
+
+if "__main__" == __name__:
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: parse_tree_formats.py <input path> [repeat]")
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) == 3 else 20)
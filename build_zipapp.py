@@ -0,0 +1,65 @@
+"""
+Builds JackAnalyzer.pyz: the whole analyzer in a single executable zipapp,
+holding precompiled bytecode only, so that no module has to be compiled
+when it starts, even where bytecode caching is unavailable or disabled.
+The bytecode is specific to the Python version that builds the zipapp, and
+the zipapp must be run with that same version.
+
+Usage: python3 build_zipapp.py [output path]
+"""
+import os
+import py_compile
+import stat
+import sys
+import tempfile
+import zipfile
+
+MODULES = ["JackAnalyzer", "JackNormalizer", "JackTokenizer",
+           "CompilationEngine", "BinaryCompilationEngine",
+           "MetricsCompilationEngine", "GrammarProfiler"]
+MAIN = "import sys\nimport JackAnalyzer\nJackAnalyzer.main(sys.argv[1:])\n"
+
+
+def compile_module(source_path: str, build_directory: str) -> str:
+    """Compiles a module to bytecode that is never checked against the
+    source, since the source is not shipped.
+
+    Returns:
+        str: the path of the compiled file.
+    """
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    compiled_path = os.path.join(build_directory, name + ".pyc")
+    py_compile.compile(
+        source_path, cfile=compiled_path, doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    return compiled_path
+
+
+def build(output_path: str) -> None:
+    """Builds the zipapp at the given path."""
+    source_directory = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as build_directory:
+        main_path = os.path.join(build_directory, "__main__.py")
+        with open(main_path, 'w') as main_file:
+            main_file.write(MAIN)
+        compiled_paths = [compile_module(main_path, build_directory)]
+        for module in MODULES:
+            compiled_paths.append(compile_module(
+                os.path.join(source_directory, module + ".py"),
+                build_directory))
+        with open(output_path, 'wb') as output_file:
+            output_file.write(b"#!/usr/bin/env python3\n")
+            # Stored rather than deflated, so nothing is decompressed either
+            with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_STORED) \
+                    as archive:
+                for compiled_path in compiled_paths:
+                    archive.write(compiled_path,
+                                  os.path.basename(compiled_path))
+    os.chmod(output_path, os.stat(output_path).st_mode | stat.S_IXUSR |
+             stat.S_IXGRP | stat.S_IXOTH)
+
+
+if "__main__" == __name__:
+    if len(sys.argv) > 2:
+        sys.exit("Usage: build_zipapp.py [output path]")
+    build(sys.argv[1] if len(sys.argv) == 2 else "JackAnalyzer.pyz")